@@ -0,0 +1,68 @@
+"""Server-side aggregations that keep chart payloads independent of row count."""
+import numpy as np
+import pandas as pd
+
+OTHER_LABEL = "Other"
+PIE_TOP_N = 10
+
+# Max points sent to the browser for the time-series chart
+TS_POINT_BUDGET = 2000
+# Resolution choice -> pandas resample rule ("Auto" keeps transactions, LTTB-downsampled)
+TS_RESOLUTIONS = {"Auto": None, "Day": "D", "Week": "W", "Month": "MS"}
+
+
+def category_totals(df, category_col, amount_col):
+    """Total amount per category, largest first."""
+    totals = df.groupby(category_col, observed=True, sort=False)[amount_col].sum()
+    return totals.sort_values(ascending=False)
+
+
+def top_n_with_other(totals, n, category_col, amount_col):
+    """The ``n`` largest categories plus one "Other" bucket, as a chart-ready frame."""
+    totals = totals.sort_values(ascending=False)
+    totals.index = totals.index.astype(object)
+    if len(totals) > n:
+        rest = pd.Series({OTHER_LABEL: totals.iloc[n:].sum()})
+        totals = pd.concat([totals.iloc[:n], rest])
+    return totals.rename_axis(category_col).rename(amount_col).reset_index()
+
+
+def resample_totals(ts, date_col, amount_col, rule):
+    """Sum a (date, amount) frame into fixed calendar buckets."""
+    return ts.set_index(date_col)[amount_col].resample(rule).sum().reset_index()
+
+
+def lttb_indices(x, y, n_out):
+    """Row positions kept by Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last point and, per bucket, the point forming the
+    largest triangle with the previous pick and the next bucket's mean, which
+    preserves peaks and troughs far better than taking every k-th row.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(area.argmax())
+        picked[i + 1] = a
+    return picked
+
+
+def downsample_series(ts, date_col, amount_col, n_out=TS_POINT_BUDGET):
+    """LTTB-downsample a date-sorted (date, amount) frame to at most ``n_out`` rows."""
+    if len(ts) <= n_out:
+        return ts
+    x = ts[date_col].astype("datetime64[ns]").to_numpy().astype(np.int64).astype(np.float64)
+    y = ts[amount_col].to_numpy(dtype=np.float64)
+    return ts.iloc[lttb_indices(x, y, n_out)]
@@ -1,6 +1,49 @@
+import hashlib
+import os
+import tempfile
+from collections import deque
+from functools import partial
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
+
+from aggregates import PIE_TOP_N, TS_POINT_BUDGET, TS_RESOLUTIONS, category_totals, downsample_series
+from dataset_store import DatasetRegistry
+from disk_cache import ArrowDiskCache
+from duckdb_backend import DuckDBBackend, available as duckdb_available
+from engine import (
+    category_figure, kpis, prepare, resample_series, suggest_mapping,
+    time_series, time_series_figure, window_series
+)
+from exports import EXPORT_FORMATS, build_export, read_bytes
+from filters import (
+    CategoryIndex, SortedIndex,
+    amount_values, category_options, combine_masks, date_values, value_bounds
+)
+from instrumentation import HISTORY_RUNS, RunProfile
+from ingest import (
+    CSV_ENGINES, SOURCE_COLUMN, UPLOAD_TYPES,
+    detect_format, read_columns, read_many, read_upload, union_columns
+)
+from preview import PAGE_SIZES, page_slice, view_positions
+from streaming import aggregate_csv_stream
+
+# Parsed frames kept in memory (shared by all sessions) before the
+# least-recently-used ones are evicted. Override with DASHBOARD_MAX_DATASET_MB.
+DATASET_MAX_BYTES = int(os.environ.get("DASHBOARD_MAX_DATASET_MB", 2048)) * 1024 ** 2
+
+# Parsed/coerced frames are also spilled to Arrow IPC files here so restarts skip
+# re-parsing; reloads are memory-mapped and shared through the page cache.
+# Override with DASHBOARD_CACHE_DIR / DASHBOARD_DISK_CACHE_MB.
+DISK_CACHE_DIR = os.environ.get(
+    "DASHBOARD_CACHE_DIR", os.path.join(tempfile.gettempdir(), "finance_dashboard_cache")
+)
+DISK_CACHE_MAX_BYTES = int(os.environ.get("DASHBOARD_DISK_CACHE_MB", 10240)) * 1024 ** 2
+
+# Uploads above this size default to chunked streaming ingestion
+STREAMING_THRESHOLD_BYTES = 200 * 1024 ** 2
+STREAM_PREVIEW_ROWS = 1000
 
 # ---------------------------------------------------------
 # PAGE CONFIG
@@ -28,28 +71,178 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 st.title("💼 Professional Finance Dashboard")
-st.markdown("Upload your CSV, map the columns, and explore insights.")
+st.markdown("Upload your CSV (plain or .gz/.bz2/.zst compressed) or a Parquet / Feather / Arrow file, map the columns, and explore insights.")
 
 # ---------------------------------------------------------
 # FILE UPLOADER
 # ---------------------------------------------------------
-file = st.file_uploader("Upload Budget CSV File", type=["csv"])
+files = st.file_uploader("Upload Budget File(s)", type=UPLOAD_TYPES, accept_multiple_files=True)
 
-if file is None:
-    st.info("📄 Please upload a CSV file to begin.")
+if not files:
+    st.info("📄 Please upload one or more CSV, Parquet, Feather or Arrow files to begin.")
     st.stop()
 
+# Several files (e.g. one per cost centre) are parsed in parallel and stacked
+file = files[0]
+multi = len(files) > 1
+
+# Per-stage timings for this rerun, kept in a rolling per-session history
+diagnostics = st.sidebar.toggle(
+    "⏱️ Diagnostics",
+    help="Track wall/CPU time and peak memory per pipeline stage and log them as JSON."
+)
+st.session_state["_run_id"] = st.session_state.get("_run_id", 0) + 1
+profile = RunProfile(st.session_state["_run_id"], enabled=diagnostics)
+st.session_state.setdefault("_perf_history", deque(maxlen=HISTORY_RUNS)).append(profile.stages)
+
 # ---------------------------------------------------------
-# LOAD DATA SAFELY
+# LOAD DATA SAFELY (parse once per upload, reuse on reruns)
 # ---------------------------------------------------------
+def file_digest(file):
+    """SHA-256 of the uploaded bytes, computed once per uploaded file."""
+    digests = st.session_state.setdefault("_file_digests", {})
+    if file.file_id not in digests:
+        digests[file.file_id] = hashlib.sha256(file.getbuffer()).hexdigest()
+    return digests[file.file_id]
+
+@st.cache_resource
+def get_dataset_registry():
+    """One registry per server process, shared by every session."""
+    return DatasetRegistry(
+        max_bytes=DATASET_MAX_BYTES,
+        disk_cache=ArrowDiskCache(DISK_CACHE_DIR, DISK_CACHE_MAX_BYTES)
+    )
+
+def cached_read(file, fmt, **options):
+    """Parse the upload once per process, keyed by content hash + parse options."""
+    key = (file_digest(file), fmt, tuple(sorted(options.items())))
+
+    def load():
+        return read_upload(file, fmt, **options)
+
+    return get_dataset_registry().get_or_load(key, load)
+
+def cached_read_many(files, **options):
+    """Parse and combine several uploads once per process, keyed by all their hashes.
+
+    File names are part of the key too: they label the rows' source column.
+    """
+    key = (
+        tuple(file_digest(f) for f in files), tuple(f.name for f in files), "multi",
+        tuple(sorted(options.items()))
+    )
+
+    def load():
+        return read_many([(f.name, f, *detect_format(f.name)) for f in files], **options)
+
+    return get_dataset_registry().get_or_load(key, load)
+
+@st.cache_data(max_entries=64)
+def cached_category_totals(source_key, category_col, amount_col, _df):
+    """Per-category totals, computed once per dataset + mapping."""
+    return category_totals(_df, category_col, amount_col)
+
+@st.cache_resource(max_entries=8)
+def get_duckdb_backend(dataset_key, _df):
+    """DuckDB database with the prepared frame registered (no copy), per dataset + mapping."""
+    return DuckDBBackend(_df)
+
+def backend_query(backend, method, *args):
+    """Run one DuckDB backend query; on failure warn and return None so the
+    caller falls back to pandas."""
+    try:
+        return getattr(backend, method)(*args)
+    except Exception as e:
+        st.warning(f"DuckDB {method} query failed, using pandas instead: {e}")
+        return None
+
+@st.cache_data(max_entries=64)
+def cached_bounds(column_key, _series):
+    """(min, max) of one mapped column, for the filter sliders."""
+    return value_bounds(_series)
+
+@st.cache_data(max_entries=64)
+def cached_category_options(column_key, _series):
+    return category_options(_series)
+
+def filter_index(key, build):
+    """A filter lookup built on first use and kept in the dataset registry,
+    so it counts toward the same memory ceiling as the frames."""
+    return get_dataset_registry().get_or_load(("filter_index", *key), build, spill=False)
+
+def _naive(ts):
+    # Same convention as filters.date_values: timezones converted to UTC, then dropped
+    ts = pd.Timestamp(ts)
+    return ts.tz_convert(None) if ts.tzinfo else ts
+
+def filter_bar(df, source_key, amount_col, date_col, category_col):
+    """Sidebar filter widgets; a filter left at its full range is returned as None."""
+    st.sidebar.header("🔍 Filters")
+    filters = {"date_range": None, "categories": (), "amount_range": None}
+
+    bounds = cached_bounds((source_key, amount_col, date_col), df[date_col]) if date_col else None
+    if bounds and bounds[0] < bounds[1]:
+        first, last = (_naive(b).to_pydatetime() for b in bounds)
+        chosen = st.sidebar.slider("Date Range", min_value=first, max_value=last, value=(first, last))
+        if chosen != (first, last):
+            filters["date_range"] = chosen
+
+    if category_col:
+        options = cached_category_options((source_key, amount_col, category_col), df[category_col])
+        filters["categories"] = tuple(st.sidebar.multiselect(
+            "Categories", options=options, help="Leave empty to include every category."
+        ))
+
+    bounds = cached_bounds((source_key, amount_col), df[amount_col])
+    if bounds and bounds[0] < bounds[1]:
+        low, high = float(bounds[0]), float(bounds[1])
+        chosen = st.sidebar.slider("Amount Range", min_value=low, max_value=high, value=(low, high))
+        if chosen != (low, high):
+            filters["amount_range"] = chosen
+    return filters
+
+@st.cache_data(show_spinner="Streaming upload in chunks…", max_entries=16)
+def stream_aggregates(digest, amount_col, date_col, category_col, usecols, compression, _file):
+    """KPI, category and daily totals built chunk by chunk (cached per upload + mapping)."""
+    _file.seek(0)
+    return aggregate_csv_stream(
+        _file, amount_col, date_col, category_col, usecols=usecols, compression=compression
+    )
+
+fmt, compression = detect_format(file.name)
+
+# Columnar formats are read column-projected in one go, no streaming needed
+streaming = st.sidebar.toggle(
+    "Streaming ingestion (large files)",
+    value=fmt == "csv" and not multi and file.size > STREAMING_THRESHOLD_BYTES,
+    help="Read a single CSV in chunks and aggregate incrementally instead of loading it all.",
+    disabled=fmt != "csv" or multi
+)
+
+csv_engine = st.sidebar.selectbox(
+    "CSV Parser",
+    options=CSV_ENGINES,
+    help="pyarrow parses on all cores with Arrow dtypes; falls back to c on malformed files.",
+    disabled=streaming or (fmt != "csv" and not multi)
+)
+
+backend_name = st.sidebar.selectbox(
+    "Aggregation Backend",
+    options=["pandas", "duckdb"],
+    help="duckdb computes KPIs, category totals and time buckets as vectorised SQL."
+         + ("" if duckdb_available() else " Install duckdb to enable it."),
+    disabled=streaming or not duckdb_available()
+)
+
+# Phase 1: sniff only the header so the mapping can be chosen before parsing
 try:
-    df = pd.read_csv(file)
+    if multi:
+        columns = union_columns(read_columns(f, *detect_format(f.name)) for f in files)
+        columns.append(SOURCE_COLUMN)
+    else:
+        columns = list(read_columns(file, fmt, compression))
 except Exception as e:
-    st.error(f"❌ Error loading CSV: {e}")
-    st.stop()
-
-if df.empty:
-    st.error("Uploaded file is empty. Please upload a valid CSV.")
+    st.error(f"❌ Error loading file: {e}")
     st.stop()
 
 # ---------------------------------------------------------
@@ -58,36 +251,37 @@ if df.empty:
 st.sidebar.header("⚙️ Configure Columns")
 
 st.sidebar.markdown("### 🔎 Available Columns")
-st.sidebar.write(list(df.columns))
-
-def autosuggest(cols, keywords):
-    for k in keywords:
-        for c in cols:
-            if k in c.lower():
-                return c
-    return None
+st.sidebar.write(columns)
 
-suggested_date = autosuggest(df.columns, ["date", "time"])
-suggested_amount = autosuggest(df.columns, ["amount", "amt", "price", "value", "cost", "expense"])
-suggested_category = autosuggest(df.columns, ["category", "cat", "type"])
+suggested = suggest_mapping(columns)
+suggested_date = suggested["date"]
+suggested_amount = suggested["amount"]
+suggested_category = suggested["category"]
 
 # Selectboxes
 date_col = st.sidebar.selectbox(
     "Select Date Column (optional)",
-    options=[None] + list(df.columns),
-    index=(list(df.columns).index(suggested_date) + 1) if suggested_date else 0
+    options=[None] + columns,
+    index=(columns.index(suggested_date) + 1) if suggested_date else 0
 )
 
 amount_col = st.sidebar.selectbox(
     "Select Amount Column (Required)",
-    options=[None] + list(df.columns),
-    index=(list(df.columns).index(suggested_amount) + 1) if suggested_amount else 0
+    options=[None] + columns,
+    index=(columns.index(suggested_amount) + 1) if suggested_amount else 0
 )
 
 category_col = st.sidebar.selectbox(
     "Select Category Column (optional)",
-    options=[None] + list(df.columns),
-    index=(list(df.columns).index(suggested_category) + 1) if suggested_category else 0
+    options=[None] + columns,
+    index=(columns.index(suggested_category) + 1) if suggested_category else 0
+)
+
+mapped_cols = [c for c in (date_col, amount_col, category_col) if c]
+keep_cols = st.sidebar.multiselect(
+    "Extra Columns to Keep in Preview",
+    options=[c for c in columns if c not in mapped_cols],
+    help="Only mapped and kept columns are parsed."
 )
 
 # ---------------------------------------------------------
@@ -97,16 +291,157 @@ if amount_col is None:
     st.error("⚠️ You must select an Amount column.")
     st.stop()
 
-# TYPES — SAFE CONVERSION
+# ---------------------------------------------------------
+# PIPELINE (each stage is cached on exactly the inputs it depends on)
+#   upload + base columns -> load -> coerce(amount, date) -> series(date)
+#   upload + category column --------------------------------> category totals
+# so remapping one column only recomputes the stages downstream of it.
+# ---------------------------------------------------------
+def load_columns(cols):
+    """Parse only ``cols`` of the upload(s), kept in file order."""
+    if multi:
+        # The source column is added while combining, never read from the files
+        return cached_read_many(files, usecols=tuple(c for c in cols if c != SOURCE_COLUMN), engine=csv_engine)
+    if streaming:
+        # In streaming mode only a sample is parsed up front, for the preview
+        return cached_read(file, fmt, engine="c", nrows=STREAM_PREVIEW_ROWS, usecols=cols, compression=compression)
+    if fmt == "csv":
+        return cached_read(file, fmt, engine=csv_engine, usecols=cols, compression=compression)
+    return cached_read(file, fmt, usecols=cols)
+
+# Phase 2: parse only the projected columns. The category column is loaded on
+# its own, so changing it leaves the parsed + coerced amount/date frame cached.
+usecols = tuple(c for c in columns if c in mapped_cols or c in keep_cols)
+base_cols = tuple(c for c in usecols if c != category_col or c in (date_col, amount_col))
+digests = tuple(file_digest(f) for f in files)
+
 try:
-    df[amount_col] = pd.to_numeric(df[amount_col], errors="coerce")
-except:
-    st.warning("Amount column could not be fully converted to numbers.")
+    with profile.stage("load"):
+        df = load_columns(usecols if streaming else base_cols)
+except Exception as e:
+    st.error(f"❌ Error loading file: {e}")
+    st.stop()
+
+if df.empty:
+    st.error("Uploaded file is empty. Please upload a valid file.")
+    st.stop()
 
-df = df.dropna(subset=[amount_col])  # Remove rows without amount
+# TYPES — SAFE CONVERSION + AGGREGATES
+# Combined uploads label their rows by file name, so names are part of the key
+source_names = tuple(f.name for f in files) if multi else ()
+source_key = (digests, source_names, base_cols, csv_engine, streaming)
+registry = get_dataset_registry()
 
-if date_col:
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+if streaming:
+    try:
+        with profile.stage("stream"):
+            agg = stream_aggregates(
+                file_digest(file), amount_col, date_col, category_col, usecols, compression, file
+            )
+    except Exception as e:
+        st.error(f"❌ Error streaming CSV: {e}")
+        st.stop()
+    total_amount, n_transactions = agg.total, agg.count
+    cat_totals = agg.category_totals if category_col else None
+    backend = None
+    df_ts = agg.daily_frame() if date_col else None
+    df = agg.preview
+    filter_key = None
+    st.sidebar.caption("🔍 Filters are not available in streaming mode.")
+else:
+    base = df
+
+    def load_coerced():
+        frame, saved = prepare(base, amount_col, date_col)
+        frame.attrs["bytes_saved"] = saved
+        return frame
+
+    def attach_category():
+        categories = load_columns((category_col,))[category_col].reindex(coerced.index)
+        return pd.concat([coerced, categories.astype("category")], axis=1)
+
+    try:
+        with profile.stage("coerce"):
+            coerced = registry.get_or_load((source_key, "coerced", amount_col, date_col), load_coerced)
+        with profile.stage("load_category"):
+            if category_col and category_col not in coerced.columns:
+                df = registry.get_or_load(
+                    (source_key, "coerced", amount_col, date_col, category_col), attach_category
+                )
+            else:
+                df = coerced
+    except Exception as e:
+        st.error(f"❌ Amount/date columns could not be converted: {e}")
+        st.stop()
+    # Compaction can grow a small frame slightly (e.g. Arrow strings -> categoricals)
+    if coerced.attrs.get("bytes_saved", 0) > 0:
+        st.sidebar.caption(f"🗜️ Dtype compaction saved {coerced.attrs['bytes_saved'] / 1024 ** 2:,.1f} MB")
+
+    # Each filter's index is built the first time that filter is used and is
+    # keyed on its own column, so moving a slider costs a few binary searches
+    # or bitmap ORs, and remapping another column rebuilds nothing
+    filters = filter_bar(df, source_key, amount_col, date_col, category_col)
+    with profile.stage("filter"):
+        masks = []
+        date_index = None
+        if filters["date_range"]:
+            date_index = filter_index(
+                (source_key, amount_col, date_col), lambda: SortedIndex(date_values(coerced[date_col]))
+            )
+            masks.append(date_index.mask(*(np.datetime64(pd.Timestamp(d), "ns") for d in filters["date_range"])))
+        if filters["categories"]:
+            category_index = filter_index(
+                (source_key, amount_col, category_col), lambda: CategoryIndex(df[category_col])
+            )
+            masks.append(category_index.mask(filters["categories"]))
+        if filters["amount_range"]:
+            amount_index = filter_index(
+                (source_key, amount_col), lambda: SortedIndex(amount_values(coerced[amount_col]))
+            )
+            masks.append(amount_index.mask(*filters["amount_range"]))
+        mask = combine_masks(masks)
+        filter_key = tuple(filters.values()) if mask is not None else None
+        if mask is not None:
+            df = df[mask]
+
+    backend = None
+    metrics = None
+    with profile.stage("kpis"):
+        if backend_name == "duckdb" and mask is None:
+            # The SQL backend sees the whole dataset; filtered views are aggregated in pandas
+            try:
+                backend = get_duckdb_backend((source_key, amount_col, date_col, category_col), df)
+            except Exception as e:
+                st.warning(f"DuckDB backend unavailable, using pandas instead: {e}")
+        if backend:
+            metrics = backend_query(backend, "kpis", amount_col)
+        if metrics is None:
+            metrics = kpis(coerced if mask is None else df, amount_col)
+        total_amount, n_transactions = metrics["total_amount"], metrics["transactions"]
+    with profile.stage("category_totals"):
+        cat_totals = None
+        if category_col and backend:
+            cat_totals = backend_query(backend, "category_totals", category_col, amount_col)
+        if category_col and cat_totals is None:
+            if mask is not None:
+                cat_totals = category_totals(df, category_col, amount_col)
+            else:
+                cat_totals = cached_category_totals(source_key, category_col, amount_col, df)
+    with profile.stage("time_series"):
+        def load_series():
+            series = backend_query(backend, "series", date_col, amount_col) if backend else None
+            return time_series(coerced, date_col, amount_col) if series is None else series
+
+        if date_col and date_index is not None:
+            # The date index yields the filtered rows already in date order: no sort
+            df_ts = coerced.iloc[date_index.sorted_positions(mask)][[date_col, amount_col]]
+        elif date_col and mask is not None:
+            df_ts = time_series(df, date_col, amount_col)
+        elif date_col:
+            # Sorted (date, amount) pairs, cached like the frame they come from
+            df_ts = registry.get_or_load((source_key, "series", amount_col, date_col, backend_name), load_series)
+        else:
+            df_ts = None
 
 # ---------------------------------------------------------
 # KPI CARDS
@@ -117,57 +452,143 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
-    st.metric("💸 Total Amount", f"₹ {df[amount_col].sum():,.2f}")
+    st.metric("💸 Total Amount", f"₹ {total_amount:,.2f}")
     st.markdown("</div>", unsafe_allow_html=True)
 
 with col2:
     st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
-    st.metric("📁 Transactions", f"{len(df)}")
+    st.metric("📁 Transactions", f"{n_transactions}")
     st.markdown("</div>", unsafe_allow_html=True)
 
 # ---------------------------------------------------------
 # CHARTS
+# Each section below is a fragment: its own widgets rerun only that section.
 # ---------------------------------------------------------
 st.subheader("📈 Visual Insights")
 
 # CATEGORY PIE CHART
-if category_col:
+@st.fragment
+def category_chart(cat_totals, category_col, amount_col):
     try:
-        fig = px.pie(
-            df,
-            names=category_col,
-            values=amount_col,
-            title="Expense Distribution by Category"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        top_n = st.number_input("Categories Shown in Pie", min_value=1, value=PIE_TOP_N)
+        with profile.stage("pie_chart"):
+            fig = category_figure(cat_totals, category_col, amount_col, top_n)
+            st.plotly_chart(fig, use_container_width=True)
     except Exception as e:
         st.warning("Could not generate category chart: " + str(e))
 
 # TIME SERIES CHART
-if date_col:
+@st.fragment
+def time_series_chart(df_ts, date_col, amount_col, daily, backend=None):
     try:
-        df_ts = df.dropna(subset=[date_col]).sort_values(date_col)
-        fig2 = px.line(
-            df_ts,
-            x=date_col,
-            y=amount_col,
-            markers=True,
-            title="Expenses Over Time"
+        resolution = st.selectbox(
+            "Time Series Resolution",
+            options=list(TS_RESOLUTIONS),
+            help=f"Auto plots transactions, downsampled (LTTB) to {TS_POINT_BUDGET:,} points."
         )
-        st.plotly_chart(fig2, use_container_width=True)
+        with profile.stage("line_chart"):
+            ts = None
+            if backend and TS_RESOLUTIONS[resolution]:
+                ts = backend_query(backend, "time_buckets", date_col, amount_col, resolution)
+            if ts is None:
+                ts = resample_series(df_ts, date_col, amount_col, resolution)
+
+            # Zooming narrows the window; once it fits the budget every point is shown
+            if len(ts) > 1 and ts[date_col].iloc[0] < ts[date_col].iloc[-1]:
+                first, last = ts[date_col].iloc[0].to_pydatetime(), ts[date_col].iloc[-1].to_pydatetime()
+                start, end = st.slider("Zoom Date Range", min_value=first, max_value=last, value=(first, last))
+                ts = window_series(ts, date_col, pd.Timestamp(start), pd.Timestamp(end))
+
+            shown = downsample_series(ts, date_col, amount_col)
+            fig2 = time_series_figure(
+                shown, date_col, amount_col,
+                title="Daily Expenses Over Time" if daily and resolution == "Auto" else "Expenses Over Time"
+            )
+            st.plotly_chart(fig2, use_container_width=True)
+        if len(shown) < len(ts):
+            st.caption(f"Showing {len(shown):,} of {len(ts):,} points (LTTB). Zoom in for full resolution.")
     except Exception as e:
         st.warning("Could not generate time series chart: " + str(e))
 
+if category_col:
+    category_chart(cat_totals, category_col, amount_col)
+
+if date_col:
+    time_series_chart(df_ts, date_col, amount_col, daily=streaming, backend=backend)
+
 # ---------------------------------------------------------
 # DATA TABLE + DOWNLOAD
 # ---------------------------------------------------------
+@st.fragment
+def data_preview(df, dataset_key):
+    pc1, pc2, pc3, pc4, pc5 = st.columns([2, 1, 2, 2, 1])
+    sort_col = pc1.selectbox("Sort By", options=[None] + list(df.columns))
+    ascending = pc2.toggle("Ascending", value=True)
+    filter_col = pc3.selectbox("Filter Column", options=[None] + list(df.columns))
+    needle = pc4.text_input("Contains", disabled=filter_col is None)
+    page_size = pc5.selectbox("Rows / Page", options=PAGE_SIZES)
+
+    # The filtered/sorted view is kept per session, so paging only re-slices it
+    view_key = (dataset_key, sort_col, ascending, filter_col, needle)
+    with profile.stage("preview"):
+        view = st.session_state.get("_preview_view")
+        if view is None or view[0] != view_key:
+            view = (view_key, view_positions(df, sort_col, ascending, filter_col, needle))
+            st.session_state["_preview_view"] = view
+        positions = view[1]
+
+    n_pages = max(1, -(-len(positions) // page_size))
+    page = st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1)
+    st.dataframe(page_slice(df, positions, page, page_size), use_container_width=True)
+    st.caption(
+        f"Rows {min((page - 1) * page_size + 1, len(positions)):,}–{min(page * page_size, len(positions)):,}"
+        f" of {len(positions):,}"
+    )
+
+@st.fragment
+def export_section(df, dataset_key):
+    # Exports are only built on request and reused for the same dataset + mapping
+    export_format = st.selectbox("Export Format", options=list(EXPORT_FORMATS))
+    ext, mime, _ = EXPORT_FORMATS[export_format]
+    export_key = (dataset_key, export_format)
+    if st.button("📦 Prepare Export"):
+        try:
+            with st.spinner("Writing export…"), profile.stage("export"):
+                st.session_state["_export"] = (export_key, build_export(df, export_key, export_format))
+        except Exception as e:
+            st.error(f"❌ Could not build {export_format} export: {e}")
+
+    export = st.session_state.get("_export")
+    if export and export[0] == export_key and os.path.exists(export[1]):
+        # A callable defers reading the file until the button is clicked
+        st.download_button(
+            f"⬇️ Download Processed {export_format}",
+            partial(read_bytes, export[1]),
+            f"processed_budget.{ext}",
+            mime
+        )
+
+dataset_key = (source_key, amount_col, date_col, category_col, filter_key)
+
 st.subheader("📄 Final Data Preview")
-st.dataframe(df, use_container_width=True)
+if streaming:
+    st.caption(f"Previewing the first {len(df):,} processed rows (streaming mode).")
+data_preview(df, dataset_key)
 
-st.download_button(
-    "⬇️ Download Processed CSV",
-    df.to_csv(index=False),
-    "processed_budget.csv",
-    "text/csv"
-)
+if streaming:
+    st.info("Processed CSV download is not available in streaming mode.")
+else:
+    export_section(df, dataset_key)
+
+# ---------------------------------------------------------
+# DIAGNOSTICS PANEL
+# ---------------------------------------------------------
+if diagnostics:
+    with st.expander("⏱️ Diagnostics — pipeline stage timings", expanded=True):
+        st.caption("This rerun (fragment reruns are added to the run that rendered them)")
+        st.dataframe(pd.DataFrame(profile.stages), use_container_width=True, hide_index=True)
 
+        history = pd.DataFrame([r for run in st.session_state["_perf_history"] for r in run])
+        if history["run"].nunique() > 1:
+            st.caption(f"Wall time (ms) per stage, last {HISTORY_RUNS} reruns")
+            st.line_chart(history.pivot_table(index="run", columns="stage", values="wall_ms", aggfunc="sum"))
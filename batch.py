@@ -0,0 +1,107 @@
+"""Nightly batch reports: run the dashboard pipeline over a directory of ledgers.
+
+    python batch.py ledgers/ reports/ --workers 4 --exports parquet csv --png
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine import build_report, ledger_columns, load_ledger, suggest_mapping
+from exports import EXPORT_FORMATS
+from ingest import COMPRESSIONS, FORMATS
+
+# CLI export name -> dashboard export format label
+EXPORTS = {"csv": "CSV", "csv.gz": "CSV (gzip)", "parquet": "Parquet", "feather": "Feather", "xlsx": "Excel"}
+
+
+def find_ledgers(input_dir):
+    """Supported ledger files directly inside ``input_dir``, sorted by name."""
+    extensions = tuple([*FORMATS, *COMPRESSIONS])
+    return sorted(
+        os.path.join(input_dir, name) for name in os.listdir(input_dir)
+        if name.lower().endswith(extensions)
+    )
+
+
+def process_ledger(path, out_dir, mapping=None, exports=("parquet",), png=False, engine="pyarrow"):
+    """Build one ledger's report into ``out_dir/<ledger name>/``; returns a summary."""
+    columns = ledger_columns(path)
+    mapping = {**suggest_mapping(columns), **{k: v for k, v in (mapping or {}).items() if v}}
+    if not mapping["amount"]:
+        raise ValueError("no amount column found; pass --amount-col")
+
+    usecols = tuple(c for c in columns if c in mapping.values())
+    report = build_report(
+        load_ledger(path, usecols=usecols, engine=engine),
+        mapping["amount"], mapping["date"], mapping["category"]
+    )
+
+    target = os.path.join(out_dir, os.path.basename(path).replace(".", "_"))
+    os.makedirs(target, exist_ok=True)
+    with open(os.path.join(target, "kpis.json"), "w") as fh:
+        json.dump({"source": path, "mapping": mapping, **report["kpis"]}, fh, indent=2)
+
+    for name in ("category_figure", "time_series_figure"):
+        if name in report:
+            fig = report[name]
+            fig.write_html(os.path.join(target, f"{name}.html"), include_plotlyjs="cdn")
+            if png:
+                # Needs the optional kaleido package
+                fig.write_image(os.path.join(target, f"{name}.png"))
+
+    for export in exports:
+        ext, _, writer = EXPORT_FORMATS[EXPORTS[export]]
+        writer(report["data"], os.path.join(target, f"processed.{ext}"))
+
+    return {"source": path, "output": target, **report["kpis"]}
+
+
+def run_batch(paths, out_dir, workers=None, **options):
+    """Process ledgers in parallel worker processes; failures are reported, not raised."""
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_ledger, path, out_dir, **options): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"source": futures[future], "error": str(e)})
+    return sorted(results, key=lambda r: r["source"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--date-col")
+    parser.add_argument("--amount-col")
+    parser.add_argument("--category-col")
+    parser.add_argument("--exports", nargs="*", choices=list(EXPORTS), default=["parquet"])
+    parser.add_argument("--png", action="store_true", help="Also write PNG charts (needs kaleido).")
+    parser.add_argument("--engine", default="pyarrow", help="CSV parser: pyarrow or c.")
+    args = parser.parse_args(argv)
+
+    paths = find_ledgers(args.input_dir)
+    if not paths:
+        parser.error(f"no supported ledger files in {args.input_dir}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    mapping = {"date": args.date_col, "amount": args.amount_col, "category": args.category_col}
+    results = run_batch(
+        paths, args.output_dir, workers=args.workers,
+        mapping=mapping, exports=args.exports, png=args.png, engine=args.engine
+    )
+    with open(os.path.join(args.output_dir, "summary.json"), "w") as fh:
+        json.dump(results, fh, indent=2)
+
+    failed = [r for r in results if "error" in r]
+    for r in failed:
+        print(f"FAILED {r['source']}: {r['error']}")
+    print(f"Processed {len(results) - len(failed)}/{len(results)} ledgers into {args.output_dir}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1 @@
+"""Headless benchmarks for the dashboard pipeline (run with ``python -m benchmarks.run``)."""
@@ -0,0 +1,107 @@
+"""Synthetic budget-ledger generator for benchmarks.
+
+    python -m benchmarks.generate --rows 1000000 --out ledger.csv
+"""
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+GENERATE_CHUNK_ROWS = 1_000_000
+DIRTY_AMOUNTS = ["₹{:,.2f}", "({:.2f})", "{:.2f}-", "Rs. {:,.2f}"]
+# DIRTY_AMOUNTS styles that denote a negative amount
+NEGATIVE_STYLES = {1, 2}
+MISSING_AMOUNTS = ["", "n/a", "-"]
+
+
+def generate_chunk(rng, rows, categories=12, start="2022-01-01", end="2024-12-31",
+                   dirty_ratio=0.02, wide_columns=0, date_format="%Y-%m-%d"):
+    """One chunk of a ledger: Date, Category, Description, Amount (+ filler columns).
+
+    ``dirty_ratio`` of the amounts are written with currency symbols,
+    accounting negatives or as missing markers, the way real exports are.
+    Returns ``(frame, amounts)``, where ``amounts`` holds the value each row
+    should parse to (NaN for missing markers).
+    """
+    days = pd.date_range(start, end, freq="D")
+    day_labels = days.strftime(date_format).to_numpy()
+    category_labels = np.array([f"Category {i:02d}" for i in range(categories)])
+
+    # Skewed category popularity, like real spend
+    weights = 1 / np.arange(1, categories + 1)
+    frame = pd.DataFrame({
+        "Date": day_labels[rng.integers(0, len(days), rows)],
+        "Category": category_labels[rng.choice(categories, rows, p=weights / weights.sum())],
+        "Description": np.char.add("TXN-", rng.integers(0, 10 ** 8, rows).astype(str)),
+        "Amount": np.round(rng.gamma(2.0, 500.0, rows), 2),
+    })
+
+    expected = frame["Amount"].copy()
+    n_dirty = int(rows * dirty_ratio)
+    if n_dirty:
+        dirty = rng.choice(rows, n_dirty, replace=False)
+        amounts = frame["Amount"].astype(object)
+        styles = rng.integers(0, len(DIRTY_AMOUNTS) + len(MISSING_AMOUNTS), n_dirty)
+        for pos, style in zip(dirty, styles):
+            if style < len(DIRTY_AMOUNTS):
+                amounts.iat[pos] = DIRTY_AMOUNTS[style].format(amounts.iat[pos])
+                if style in NEGATIVE_STYLES:
+                    expected.iat[pos] = -expected.iat[pos]
+            else:
+                amounts.iat[pos] = MISSING_AMOUNTS[style - len(DIRTY_AMOUNTS)]
+                expected.iat[pos] = np.nan
+        frame["Amount"] = amounts
+
+    for i in range(wide_columns):
+        frame[f"Extra {i:02d}"] = rng.integers(0, 1000, rows)
+    return frame, expected
+
+
+def expected_path(path):
+    """Sidecar JSON holding the KPIs a correct pipeline must report for ``path``."""
+    return path + ".expected.json"
+
+
+def write_ledger(path, rows, seed=0, chunk_rows=GENERATE_CHUNK_ROWS, compression="infer", **options):
+    """Write a ``rows``-row synthetic ledger CSV to ``path`` chunk by chunk.
+
+    Returns (and writes to ``expected_path(path)``) the row count, the number
+    of rows with a valid amount and their total.
+    """
+    rng = np.random.default_rng(seed)
+    expected = {"rows": 0, "transactions": 0, "total_amount": 0.0}
+    for start in range(0, max(rows, 1), chunk_rows):
+        chunk, amounts = generate_chunk(rng, min(chunk_rows, rows - start), **options)
+        chunk.to_csv(
+            path, mode="a" if start else "w", header=start == 0, index=False, compression=compression
+        )
+        expected["rows"] += len(chunk)
+        expected["transactions"] += int(amounts.notna().sum())
+        expected["total_amount"] += float(amounts.sum())
+    with open(expected_path(path), "w") as fh:
+        json.dump(expected, fh)
+    return expected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--out", default="ledger.csv")
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--start", default="2022-01-01")
+    parser.add_argument("--end", default="2024-12-31")
+    parser.add_argument("--dirty-ratio", type=float, default=0.02)
+    parser.add_argument("--wide-columns", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    write_ledger(
+        args.out, args.rows, seed=args.seed, categories=args.categories, start=args.start,
+        end=args.end, dirty_ratio=args.dirty_ratio, wide_columns=args.wide_columns
+    )
+    print(f"Wrote {args.rows:,} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
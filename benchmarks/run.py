@@ -0,0 +1,157 @@
+"""Time the dashboard pipeline headlessly on synthetic ledgers.
+
+    python -m benchmarks.run --rows 10000 1000000 --out bench.json --compare previous.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+from aggregates import category_totals
+from benchmarks.generate import expected_path, write_ledger
+from engine import (
+    category_figure, kpis, load_ledger, prepare, time_series, time_series_figure, time_series_view
+)
+from exports import write_csv, write_parquet
+from instrumentation import RunProfile
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_ROWS = [10_000, 1_000_000]
+
+DATE_COL, AMOUNT_COL, CATEGORY_COL = "Date", "Amount", "Category"
+
+
+def ledger_path(rows, dirty_ratio, wide_columns, seed):
+    """Generate (once) a synthetic ledger for these parameters; returns ``(path, expected)``."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"ledger_{rows}_{dirty_ratio}_{wide_columns}_{seed}.csv")
+    if os.path.exists(path) and os.path.exists(expected_path(path)):
+        with open(expected_path(path)) as fh:
+            return path, json.load(fh)
+    return path, write_ledger(path, rows, seed=seed, dirty_ratio=dirty_ratio, wide_columns=wide_columns)
+
+
+def check_results(loaded_rows, metrics, expected):
+    """Raise if the pipeline's row count or KPIs differ from what the generator wrote."""
+    problems = []
+    if loaded_rows != expected["rows"]:
+        problems.append(f"loaded {loaded_rows:,} rows, generated {expected['rows']:,}")
+    if metrics["transactions"] != expected["transactions"]:
+        problems.append(f"{metrics['transactions']:,} transactions, expected {expected['transactions']:,}")
+    if not math.isclose(metrics["total_amount"], expected["total_amount"], rel_tol=1e-9):
+        problems.append(f"total {metrics['total_amount']!r}, expected {expected['total_amount']!r}")
+    if problems:
+        raise AssertionError("Pipeline results are wrong: " + "; ".join(problems))
+
+
+def run_pipeline(path, engine, out_dir, profile):
+    """One pass of the dashboard's stages (via the engine), each timed under ``profile``.
+
+    Returns ``(loaded_rows, kpis)`` for checking against the generator.
+    """
+    with profile.stage("load"):
+        df = load_ledger(path, usecols=(DATE_COL, CATEGORY_COL, AMOUNT_COL), engine=engine)
+    loaded_rows = len(df)
+    with profile.stage("coerce"):
+        df, _ = prepare(df, AMOUNT_COL, DATE_COL)
+    with profile.stage("kpis"):
+        metrics = kpis(df, AMOUNT_COL)
+    with profile.stage("category_totals"):
+        totals = category_totals(df, CATEGORY_COL, AMOUNT_COL)
+    with profile.stage("time_series"):
+        _, shown = time_series_view(time_series(df, DATE_COL, AMOUNT_COL), DATE_COL, AMOUNT_COL)
+    with profile.stage("figures"):
+        # Serialised, since the JSON is what actually ships to the browser
+        category_figure(totals, CATEGORY_COL, AMOUNT_COL).to_json()
+        time_series_figure(shown, DATE_COL, AMOUNT_COL).to_json()
+    with profile.stage("export_csv"):
+        write_csv(df, os.path.join(out_dir, "processed.csv"))
+    with profile.stage("export_parquet"):
+        write_parquet(df, os.path.join(out_dir, "processed.parquet"))
+    return loaded_rows, metrics
+
+
+def benchmark(rows, repeat=3, engine="pyarrow", dirty_ratio=0.02, wide_columns=0, seed=0,
+              trace_memory=False):
+    """Median wall/CPU time (and max peak memory) per stage over ``repeat`` runs.
+
+    Every run's row count and KPIs are checked against the generated ledger.
+    """
+    path, expected = ledger_path(rows, dirty_ratio, wide_columns, seed)
+    records = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        for run in range(repeat):
+            profile = RunProfile(run, enabled=trace_memory)
+            check_results(*run_pipeline(path, engine, out_dir, profile), expected)
+            records.extend(profile.stages)
+
+    stages = {}
+    for record in records:
+        stages.setdefault(record["stage"], []).append(record)
+    return {
+        stage: {
+            "wall_ms": statistics.median(r["wall_ms"] for r in runs),
+            "cpu_ms": statistics.median(r["cpu_ms"] for r in runs),
+            "peak_mb": max((r["peak_mb"] or 0) for r in runs) if trace_memory else None,
+        }
+        for stage, runs in stages.items()
+    }
+
+
+def report_table(results, baseline=None):
+    """Readable per-size, per-stage table, with speed-up vs ``baseline`` if given."""
+    rows = []
+    for size, stages in results["sizes"].items():
+        for stage, timing in stages.items():
+            row = {"rows": int(size), "stage": stage, **timing}
+            base = (baseline or {}).get("sizes", {}).get(size, {}).get(stage)
+            if base and timing["wall_ms"]:
+                row["vs_baseline"] = round(base["wall_ms"] / timing["wall_ms"], 2)
+            rows.append(row)
+    return pd.DataFrame(rows).to_string(index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engine", default="pyarrow")
+    parser.add_argument("--dirty-ratio", type=float, default=0.02)
+    parser.add_argument("--wide-columns", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true", help="Trace peak memory (slows the run).")
+    parser.add_argument("--out", help="Write the JSON report here.")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against.")
+    args = parser.parse_args(argv)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "params": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "sizes": {},
+    }
+    for rows in args.rows:
+        results["sizes"][str(rows)] = benchmark(
+            rows, args.repeat, args.engine, args.dirty_ratio, args.wide_columns, args.seed, args.memory
+        )
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+    print(report_table(results, baseline))
+
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Process-wide store of parsed datasets shared across Streamlit sessions."""
+import threading
+from collections import OrderedDict
+
+
+def frame_nbytes(frame):
+    """Resident size of a DataFrame in bytes (including object payloads).
+
+    Other entries (e.g. filter indexes) report their own ``nbytes``.
+    """
+    if not hasattr(frame, "memory_usage"):
+        return int(frame.nbytes)
+    return int(frame.memory_usage(deep=True).sum())
+
+
+class DatasetRegistry:
+    """LRU registry of parsed frames keyed by content hash (+ parse options).
+
+    Filter indexes built over those frames live here too, so they count
+    toward the same memory ceiling.
+
+    Frames handed out are shared between sessions and must be treated as
+    immutable: derive new frames (assign / copy) instead of editing in place.
+    With a ``disk_cache`` (see disk_cache.ArrowDiskCache), misses are first
+    looked up on disk and newly loaded frames are spilled to it.
+    """
+
+    def __init__(self, max_bytes, disk_cache=None):
+        self.max_bytes = max_bytes
+        self.disk_cache = disk_cache
+        self._entries = OrderedDict()  # key -> (frame, nbytes)
+        self._loading = {}  # key -> lock held while that key is being parsed
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, frame):
+        nbytes = frame_nbytes(frame)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.resident_bytes -= old[1]
+            self._entries[key] = (frame, nbytes)
+            self.resident_bytes += nbytes
+            self._evict()
+        return frame
+
+    def get_or_load(self, key, loader, spill=True):
+        """Return the frame for ``key``, calling ``loader()`` at most once across sessions.
+
+        ``spill=False`` keeps the entry out of the disk cache (for entries
+        that aren't frames or are cheaper to rebuild than to reload).
+        """
+        frame = self.get(key)
+        if frame is not None:
+            return frame
+
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                # Another session may have finished parsing while we waited
+                frame = self.get(key)
+                if frame is None and spill and self.disk_cache is not None:
+                    frame = self.disk_cache.get(key)
+                    if frame is not None:
+                        self.put(key, frame)
+                if frame is None:
+                    frame = self.put(key, loader())
+                    if spill and self.disk_cache is not None:
+                        self.disk_cache.put(key, frame)
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+        return frame
+
+    def stats(self):
+        with self._lock:
+            return {
+                "datasets": len(self._entries),
+                "resident_bytes": self.resident_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _evict(self):
+        # Drop least-recently-used datasets, but never the one just added
+        while len(self._entries) > 1 and self.resident_bytes > self.max_bytes:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.resident_bytes -= nbytes
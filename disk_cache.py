@@ -0,0 +1,92 @@
+"""On-disk Arrow IPC cache of parsed/coerced frames that survives restarts."""
+import hashlib
+import logging
+import os
+import threading
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# Part of every file's key: bump it whenever parsing / coercion output changes,
+# so frames written by older code are never reloaded
+CACHE_VERSION = 2
+
+
+class ArrowDiskCache:
+    """Frames spilled to ``directory`` as uncompressed Arrow IPC (Feather v2) files.
+
+    Reloads memory-map the file and convert without copying wherever the
+    dtype allows (numbers, datetimes and Arrow-backed columns without nulls),
+    so sessions and processes reading the same dataset share the OS page
+    cache, and columns nobody touches are never paged in.
+
+    File modification times double as the LRU clock: reads touch the file and
+    writes evict the least recently used files once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._remove_legacy_files()
+
+    def path(self, key):
+        digest = hashlib.sha256(repr((CACHE_VERSION, key)).encode()).hexdigest()[:40]
+        return os.path.join(self.directory, f"{digest}.arrow")
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+            os.utime(path)
+        except (OSError, pa.ArrowException):
+            return None
+        # split_blocks keeps one block per column so no consolidation copy is needed;
+        # the pandas metadata restores the exact dtypes
+        return table.to_pandas(split_blocks=True)
+
+    def put(self, key, frame):
+        path = self.path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            table = pa.Table.from_pandas(frame, preserve_index=True)
+            # Uncompressed on purpose: compressed buffers can't be memory-mapped in place
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+        except Exception as e:
+            # Not every frame is Arrow-representable (e.g. mixed-type object columns)
+            logger.warning("Could not spill dataset to disk: %s", e)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self._evict()
+
+    def _remove_legacy_files(self):
+        # Parquet spills from before the Arrow IPC layout are never read again
+        for name in os.listdir(self.directory):
+            if name.endswith(".parquet"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith(".arrow"):
+                    stat = os.stat(os.path.join(self.directory, name))
+                    entries.append((stat.st_mtime, stat.st_size, name))
+            total = sum(size for _, size, _ in entries)
+            # Oldest first; the newest file is never removed
+            for _, size, name in sorted(entries)[:-1]:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    total -= size
+                except OSError:
+                    pass
@@ -0,0 +1,76 @@
+"""Optional embedded DuckDB backend: KPIs, category totals and time buckets as SQL."""
+try:
+    import duckdb
+except ImportError:  # optional dependency
+    duckdb = None
+
+# Time-series resolution -> DuckDB date_trunc part (weeks start on Monday)
+DATE_TRUNC_PARTS = {"Day": "day", "Week": "week", "Month": "month"}
+
+
+def available():
+    return duckdb is not None
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class DuckDBBackend:
+    """A DataFrame queried in place (no copy) by an in-process DuckDB database.
+
+    Each query runs on its own cursor, so one backend can be shared by
+    concurrent sessions. Registered frames are only visible to the
+    connection that registered them, so every cursor registers the frame.
+    """
+
+    def __init__(self, df):
+        if duckdb is None:
+            raise ImportError("duckdb is not installed")
+        self.df = df
+        self.con = duckdb.connect()
+
+    def _query(self, sql):
+        cursor = self.con.cursor()
+        try:
+            cursor.register("ledger", self.df)
+            return cursor.execute(sql).df()
+        finally:
+            cursor.close()
+
+    def kpis(self, amount_col):
+        row = self._query(f"SELECT sum({_quote(amount_col)}) AS total, count(*) AS n FROM ledger").iloc[0]
+        return {"total_amount": float(row["total"] or 0), "transactions": int(row["n"])}
+
+    def category_totals(self, category_col, amount_col):
+        """Total amount per category, largest first (same shape as aggregates.category_totals)."""
+        cat, amount = _quote(category_col), _quote(amount_col)
+        totals = self._query(
+            f"SELECT {cat} AS category, sum({amount}) AS amount FROM ledger "
+            f"WHERE {cat} IS NOT NULL GROUP BY 1 ORDER BY 2 DESC"
+        )
+        return totals.set_index("category")["amount"].rename(amount_col).rename_axis(category_col)
+
+    def series(self, date_col, amount_col):
+        """Date-sorted (date, amount) pairs."""
+        date, amount = _quote(date_col), _quote(amount_col)
+        return self._query(
+            f"SELECT {date}, {amount} FROM ledger WHERE {date} IS NOT NULL ORDER BY {date}"
+        )
+
+    def time_buckets(self, date_col, amount_col, resolution):
+        """Amount summed per day / week / month, as a (date, amount) frame.
+
+        Buckets without transactions are filled with 0, like pandas' resample.
+        """
+        date, amount = _quote(date_col), _quote(amount_col)
+        part = DATE_TRUNC_PARTS[resolution]
+        return self._query(
+            f"WITH buckets AS ("
+            f"  SELECT CAST(date_trunc('{part}', {date}) AS TIMESTAMP) AS bucket, sum({amount}) AS total"
+            f"  FROM ledger WHERE {date} IS NOT NULL GROUP BY 1"
+            f"), calendar AS ("
+            f"  SELECT unnest(generate_series(min(bucket), max(bucket), INTERVAL 1 {part})) AS bucket FROM buckets"
+            f") SELECT calendar.bucket AS {date}, coalesce(buckets.total, 0) AS {amount} "
+            f"FROM calendar LEFT JOIN buckets USING (bucket) ORDER BY 1"
+        )
@@ -0,0 +1,135 @@
+"""Streamlit-free report engine: the computations behind every dashboard section.
+
+The dashboard (app.py), the batch CLI (batch.py) and the benchmarks all call
+these functions, so a nightly report and the page show identical numbers.
+"""
+import os
+
+import plotly.express as px
+
+from aggregates import (
+    PIE_TOP_N, TS_RESOLUTIONS,
+    category_totals, downsample_series, resample_totals, top_n_with_other
+)
+from ingest import detect_format, read_columns, read_upload
+from transforms import coerce_types, compact_frame
+
+# Point-heavy charts switch from SVG to WebGL traces above this many points.
+# Override with DASHBOARD_WEBGL_THRESHOLD.
+WEBGL_POINT_THRESHOLD = int(os.environ.get("DASHBOARD_WEBGL_THRESHOLD", 1000))
+
+SUGGEST_KEYWORDS = {
+    "date": ["date", "time"],
+    "amount": ["amount", "amt", "price", "value", "cost", "expense"],
+    "category": ["category", "cat", "type"],
+}
+
+
+def autosuggest(cols, keywords):
+    for k in keywords:
+        for c in cols:
+            if k in c.lower():
+                return c
+    return None
+
+
+def suggest_mapping(columns):
+    """Best-guess ``{"date": ..., "amount": ..., "category": ...}`` column mapping."""
+    return {role: autosuggest(columns, keywords) for role, keywords in SUGGEST_KEYWORDS.items()}
+
+
+def load_ledger(path, usecols=None, engine="pyarrow"):
+    """Read a ledger file from disk in whichever supported format it is."""
+    fmt, compression = detect_format(path)
+    with open(path, "rb") as fh:
+        if fmt == "csv":
+            return read_upload(fh, fmt, usecols=usecols, engine=engine, compression=compression)
+        return read_upload(fh, fmt, usecols=usecols)
+
+
+def ledger_columns(path):
+    """Column names of a ledger file (header / schema only)."""
+    fmt, compression = detect_format(path)
+    with open(path, "rb") as fh:
+        return list(read_columns(fh, fmt, compression))
+
+
+def prepare(df, amount_col, date_col=None):
+    """Coerce and compact a loaded frame; returns ``(frame, bytes_saved)``."""
+    return compact_frame(coerce_types(df, amount_col, date_col))
+
+
+def kpis(df, amount_col):
+    return {"total_amount": float(df[amount_col].sum()), "transactions": int(len(df))}
+
+
+def time_series(df, date_col, amount_col):
+    """Date-sorted (date, amount) pairs for the expenses chart."""
+    return df.dropna(subset=[date_col]).sort_values(date_col)[[date_col, amount_col]]
+
+
+def render_mode(n_points):
+    """Plotly render mode for scatter/line traces: WebGL once SVG would struggle."""
+    return "webgl" if n_points > WEBGL_POINT_THRESHOLD else "svg"
+
+
+def category_figure(totals, category_col, amount_col, top_n=PIE_TOP_N):
+    # Only the top-N totals (+ "Other") reach Plotly, not the raw rows
+    return px.pie(
+        top_n_with_other(totals, top_n, category_col, amount_col),
+        names=category_col,
+        values=amount_col,
+        title="Expense Distribution by Category"
+    )
+
+
+def resample_series(ts, date_col, amount_col, resolution="Auto"):
+    """Sum ``ts`` into the chosen calendar buckets ("Auto" keeps transactions)."""
+    if TS_RESOLUTIONS[resolution]:
+        return resample_totals(ts, date_col, amount_col, TS_RESOLUTIONS[resolution])
+    return ts
+
+
+def window_series(ts, date_col, start, end):
+    """Rows of the date-sorted ``ts`` between ``start`` and ``end`` (binary search)."""
+    lo = ts[date_col].searchsorted(start, side="left")
+    hi = ts[date_col].searchsorted(end, side="right")
+    return ts.iloc[lo:hi]
+
+
+def time_series_view(ts, date_col, amount_col, resolution="Auto", window=None):
+    """Resample and/or cut ``ts`` to a (start, end) window; returns ``(ts, shown)``.
+
+    ``shown`` is what gets plotted: the window LTTB-downsampled to the point budget.
+    """
+    ts = resample_series(ts, date_col, amount_col, resolution)
+    if window is not None:
+        ts = window_series(ts, date_col, *window)
+    return ts, downsample_series(ts, date_col, amount_col)
+
+
+def time_series_figure(shown, date_col, amount_col, title="Expenses Over Time"):
+    return px.line(
+        shown,
+        x=date_col,
+        y=amount_col,
+        markers=len(shown) <= 500,
+        render_mode=render_mode(len(shown)),
+        title=title
+    )
+
+
+def build_report(df, amount_col, date_col=None, category_col=None, top_n=PIE_TOP_N, resolution="Auto"):
+    """Everything the dashboard shows for a loaded frame, without rendering it.
+
+    Returns a dict with the prepared frame, KPIs and the Plotly figures.
+    """
+    prepared, saved = prepare(df, amount_col, date_col)
+    report = {"data": prepared, "kpis": {**kpis(prepared, amount_col), "bytes_saved": saved}}
+    if category_col:
+        totals = category_totals(prepared, category_col, amount_col)
+        report["category_figure"] = category_figure(totals, category_col, amount_col, top_n)
+    if date_col:
+        _, shown = time_series_view(time_series(prepared, date_col, amount_col), date_col, amount_col, resolution)
+        report["time_series_figure"] = time_series_figure(shown, date_col, amount_col)
+    return report
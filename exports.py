@@ -0,0 +1,141 @@
+"""Processed-data exports, written to disk in chunks and reused by key."""
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlsxwriter
+
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "finance_dashboard_exports")
+EXPORT_CHUNK_ROWS = 100_000
+# Older export files beyond this count are deleted
+EXPORT_MAX_FILES = 16
+EXCEL_MAX_ROWS = 1_048_575  # sheet limit minus the header row
+# Part of every export's file name: bump it whenever parsing / coercion output
+# changes, so exports built by older code are never served
+EXPORT_VERSION = 2
+
+
+def export_path(export_key, ext):
+    """Stable file path for an export of ``export_key`` (dataset hash + mapping)."""
+    digest = hashlib.sha256(repr((EXPORT_VERSION, export_key)).encode()).hexdigest()[:32]
+    return os.path.join(EXPORT_DIR, f"{digest}.{ext}")
+
+
+def _slices(df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        yield start, df.iloc[start:start + chunk_rows]
+
+
+def _write_csv_to(fh, df, chunk_rows):
+    if df.empty:
+        df.to_csv(fh, index=False)
+    for start, part in _slices(df, chunk_rows):
+        part.to_csv(fh, header=start == 0, index=False)
+
+
+def write_csv(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write ``df`` as CSV a slice at a time, never building one giant string."""
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        _write_csv_to(fh, df, chunk_rows)
+
+
+def write_csv_gz(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Gzip-compressed CSV, compressed as each slice is written."""
+    with gzip.open(path, "wt", newline="", encoding="utf-8") as fh:
+        _write_csv_to(fh, df, chunk_rows)
+
+
+def _arrow_tables(df, schema, chunk_rows):
+    # One schema for the whole frame so every slice converts identically
+    for _, part in _slices(df, chunk_rows):
+        yield pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+
+
+def write_parquet(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Parquet (zstd), one row group per slice."""
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for table in _arrow_tables(df, schema, chunk_rows):
+            writer.write_table(table)
+
+
+def write_feather(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Feather v2 (Arrow IPC file, lz4), one record batch per slice."""
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    options = pa.ipc.IpcWriteOptions(compression="lz4")
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+        for table in _arrow_tables(df, schema, chunk_rows):
+            writer.write_table(table)
+
+
+def write_xlsx(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Excel via xlsxwriter's constant-memory mode, rows flushed as they are written.
+
+    Constant-memory mode drops cells written to rows that were already
+    flushed, and ``DataFrame.to_excel`` writes column by column, so rows are
+    written here one at a time in order.
+    """
+    if len(df) > EXCEL_MAX_ROWS:
+        raise ValueError(f"Excel sheets hold at most {EXCEL_MAX_ROWS:,} rows; this export has {len(df):,}.")
+    options = {"constant_memory": True, "default_date_format": "yyyy-mm-dd", "remove_timezone": True}
+    with xlsxwriter.Workbook(path, options) as workbook:
+        sheet = workbook.add_worksheet()
+        sheet.write_row(0, 0, [str(c) for c in df.columns])
+        row = 1
+        for _, part in _slices(df, chunk_rows):
+            # Python scalars, with missing values as blank cells
+            part = part.astype(object).where(part.notna(), None)
+            for values in part.itertuples(index=False, name=None):
+                sheet.write_row(row, 0, values)
+                row += 1
+
+
+# Label -> (file extension, MIME type, writer)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv", write_csv),
+    "CSV (gzip)": ("csv.gz", "application/gzip", write_csv_gz),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", write_parquet),
+    "Feather": ("feather", "application/vnd.apache.arrow.file", write_feather),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", write_xlsx),
+}
+
+
+def build_export(df, export_key, fmt="CSV"):
+    """Path to the ``fmt`` export for ``export_key``, writing it only if missing."""
+    ext, _, writer = EXPORT_FORMATS[fmt]
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    path = export_path(export_key, ext)
+    if not os.path.exists(path):
+        # Per-writer temp name: concurrent sessions may export the same key
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            writer(df, tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        _prune()
+    return path
+
+
+def read_bytes(path):
+    """Contents of a finished export (read only when a download is requested)."""
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+def _prune():
+    files = sorted(
+        (os.path.join(EXPORT_DIR, name) for name in os.listdir(EXPORT_DIR) if not name.endswith(".part")),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    for old in files[EXPORT_MAX_FILES:]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
@@ -0,0 +1,103 @@
+"""Indexed filtering of a prepared frame by date range, categories and amount range.
+
+Each lookup is its own object, built the first time its filter is used, so
+an untouched filter costs nothing and remapping one column leaves the
+others' lookups valid.
+"""
+import numpy as np
+import pandas as pd
+
+# Bitmaps cost n/8 bytes per category on top of the codes, buying faster
+# unions for few categories; above this count np.isin on the codes is used
+MAX_BITMAP_CATEGORIES = 64
+
+
+def date_values(series):
+    """Dates as a numpy datetime64[ns] array (timezones dropped), NaT for missing."""
+    if getattr(series.dtype, "tz", None) is not None:
+        series = series.dt.tz_convert(None)
+    return series.astype("datetime64[ns]").to_numpy()
+
+
+def amount_values(series):
+    """Amounts as a numpy float64 array, NaN for missing."""
+    return series.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def value_bounds(series):
+    """``(min, max)`` of the non-missing values, or None; a linear scan, no sort."""
+    lo, hi = series.min(), series.max()
+    return None if pd.isna(lo) else (lo, hi)
+
+
+def category_options(series):
+    """Distinct categories, in the order CategoryIndex numbers them."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return list(series.cat.categories)
+    return list(pd.factorize(series, sort=True)[1])
+
+
+def combine_masks(masks):
+    """AND of the row masks, or None when there are none (nothing filtered)."""
+    return np.logical_and.reduce(masks) if masks else None
+
+
+class SortedIndex:
+    """Row positions ordered by value, for binary-searched range lookups."""
+
+    def __init__(self, values):
+        order = np.argsort(values, kind="stable")
+        ordered = values[order]
+        # NaN / NaT sort last; they never match a range
+        valid = int(np.count_nonzero(~pd.isna(ordered)))
+        dtype = np.int32 if len(values) < 2 ** 31 else np.int64
+        self.n = len(values)
+        self.order = order[:valid].astype(dtype)
+        self.values = ordered[:valid]
+
+    @property
+    def nbytes(self):
+        return self.order.nbytes + self.values.nbytes
+
+    def positions(self, lo, hi):
+        """Positions of rows with ``lo <= value <= hi``."""
+        start = np.searchsorted(self.values, lo, side="left")
+        end = np.searchsorted(self.values, hi, side="right")
+        return self.order[start:end]
+
+    def mask(self, lo, hi):
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self.positions(lo, hi)] = True
+        return mask
+
+    def sorted_positions(self, mask):
+        """Positions of the masked rows with a value, already in value order."""
+        return self.order[mask[self.order]]
+
+
+class CategoryIndex:
+    """Category codes (plus per-category bitmaps when there are few categories)."""
+
+    def __init__(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # The categorical's own codes: no factorize pass, no copy
+            self.codes = series.cat.codes.to_numpy()
+            self.categories = list(series.cat.categories)
+        else:
+            codes, uniques = pd.factorize(series, sort=True)
+            self.codes, self.categories = codes, list(uniques)
+        self._positions = {c: i for i, c in enumerate(self.categories)}
+        self._bitmaps = None
+        if len(self.categories) <= MAX_BITMAP_CATEGORIES:
+            self._bitmaps = [np.packbits(self.codes == i) for i in range(len(self.categories))]
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + sum(b.nbytes for b in self._bitmaps or ())
+
+    def mask(self, selected):
+        wanted = [self._positions[c] for c in selected if c in self._positions]
+        if self._bitmaps is None or not wanted:
+            return np.isin(self.codes, wanted)
+        packed = np.bitwise_or.reduce([self._bitmaps[i] for i in wanted])
+        return np.unpackbits(packed, count=len(self.codes)).astype(bool)
@@ -0,0 +1,185 @@
+"""Readers that turn an uploaded file into a DataFrame."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+CSV_ENGINES = ["pyarrow", "c"]
+
+# Upload extension -> reader format
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "arrow",
+    ".arrow": "arrow",
+    ".ipc": "arrow",
+}
+# Compressed CSV extension -> pandas compression codec (decompressed as a stream)
+COMPRESSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".zst": "zstd",
+}
+UPLOAD_TYPES = [ext.lstrip(".") for ext in [*FORMATS, *COMPRESSIONS]]
+
+# Column added when several uploads are combined into one frame
+SOURCE_COLUMN = "source_file"
+
+
+def detect_format(name):
+    """Reader format and compression codec for an uploaded file name.
+
+    ``budget.csv.gz`` -> ``("csv", "gzip")``; unknown extensions read as plain CSV.
+    """
+    ext = os.path.splitext(name.lower())[1]
+    compression = COMPRESSIONS.get(ext)
+    if compression:
+        return "csv", compression
+    return FORMATS.get(ext, "csv"), None
+
+
+def read_csv(file, engine="pyarrow", **options):
+    """Parse a CSV upload.
+
+    ``engine="pyarrow"`` uses Arrow's multithreaded reader and keeps
+    Arrow-backed dtypes. Files (or options, e.g. ``nrows``) it cannot handle
+    fall back to the default C parser with numpy dtypes.
+    """
+    if engine == "pyarrow":
+        try:
+            file.seek(0)
+            return pd.read_csv(file, engine="pyarrow", dtype_backend="pyarrow", **options)
+        except Exception:
+            # Malformed rows, unsupported options: retry with the forgiving C parser
+            pass
+
+    file.seek(0)
+    return pd.read_csv(file, **options)
+
+
+def _buffer(file):
+    # Wrap the uploaded bytes without copying them; Arrow reads straight from it
+    if hasattr(file, "getbuffer"):
+        return pa.BufferReader(pa.py_buffer(file.getbuffer()))
+    # A file on disk (batch runs): memory-map it instead
+    return pa.memory_map(file.name)
+
+
+def _read_arrow_table(file, columns=None):
+    try:
+        # Feather (v1/v2) and the Arrow IPC file format
+        return feather.read_table(_buffer(file), columns=columns, memory_map=False)
+    except pa.ArrowInvalid:
+        # Arrow IPC stream format
+        table = pa.ipc.open_stream(_buffer(file)).read_all()
+        return table.select(columns) if columns else table
+
+
+def _data_columns(schema):
+    # Files written by pandas store the index as columns (e.g. __index_level_0__)
+    index = (schema.pandas_metadata or {}).get("index_columns", [])
+    hidden = {c for c in index if isinstance(c, str)}
+    return [name for name in schema.names if name not in hidden]
+
+
+def read_columns(file, fmt, compression=None):
+    """Column names of the upload, read from the header / schema only."""
+    if fmt == "parquet":
+        return _data_columns(pq.read_schema(_buffer(file)))
+    if fmt == "arrow":
+        for open_reader in (pa.ipc.open_file, pa.ipc.open_stream):
+            try:
+                return _data_columns(open_reader(_buffer(file)).schema)
+            except pa.ArrowInvalid:
+                pass
+        # Feather v1 isn't Arrow IPC; its schema only comes with a full read
+        return _data_columns(feather.read_table(_buffer(file), memory_map=False).schema)
+    return list(read_csv(file, engine="c", nrows=0, compression=compression).columns)
+
+
+def read_upload(file, fmt, usecols=None, **csv_options):
+    """Read the (projected) upload; columnar formats keep Arrow buffers zero-copy."""
+    columns = list(usecols) if usecols is not None else None
+    if fmt == "parquet":
+        table = pq.read_table(_buffer(file), columns=columns)
+    elif fmt == "arrow":
+        table = _read_arrow_table(file, columns)
+    else:
+        return read_csv(file, usecols=usecols, **csv_options)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def union_columns(column_lists):
+    """All column names across uploads, in order of first appearance."""
+    return list(dict.fromkeys(c for cols in column_lists for c in cols))
+
+
+def unify_dtypes(frames):
+    """Cast columns whose dtype differs between frames to one common dtype.
+
+    All-numeric columns become float64, all-datetime columns datetime64[ns],
+    anything else the nullable string dtype.
+    """
+    frames = list(frames)
+    for col in union_columns(f.columns for f in frames):
+        present = [f[col] for f in frames if col in f.columns]
+        if len({str(s.dtype) for s in present}) <= 1:
+            continue
+        if all(pd.api.types.is_numeric_dtype(s) for s in present):
+            target = "float64"
+        elif all(pd.api.types.is_datetime64_any_dtype(s) for s in present):
+            target = "datetime64[ns]"
+        else:
+            target = "string"
+        frames = [f.astype({col: target}) if col in f.columns else f for f in frames]
+    return frames
+
+
+def _read_projected(source, usecols, engine):
+    name, file, fmt, compression = source
+    missing_all = False
+    if usecols is not None:
+        available = read_columns(file, fmt, compression)
+        usecols = [c for c in usecols if c in available]
+        if not usecols and available:
+            # An empty projection reads no rows (C) or every column (pyarrow):
+            # read one column for the row count, then drop it
+            usecols, missing_all = [available[0]], True
+    if fmt == "csv":
+        frame = read_upload(file, fmt, usecols=usecols, engine=engine, compression=compression)
+    else:
+        frame = read_upload(file, fmt, usecols=usecols)
+    return frame[[]] if missing_all else frame
+
+
+def read_many(sources, usecols=None, engine="pyarrow", max_workers=None):
+    """Parse several uploads in parallel and stack them into one frame.
+
+    ``sources`` are ``(name, file, fmt, compression)`` tuples. Each upload
+    is projected to the ``usecols`` it actually has, dtypes are reconciled and
+    a categorical ``SOURCE_COLUMN`` records which file every row came from.
+    """
+    workers = max_workers or min(len(sources), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(lambda s: _read_projected(s, usecols, engine), sources))
+
+    combined = pd.concat(unify_dtypes(frames), ignore_index=True)
+    codes = np.repeat(np.arange(len(frames)), [len(f) for f in frames])
+    combined[SOURCE_COLUMN] = pd.Categorical.from_codes(codes, categories=_unique_names(s[0] for s in sources))
+    return combined
+
+
+def _unique_names(names):
+    # Two uploads may share a file name; keep categories distinct
+    seen = []
+    for name in names:
+        label, n = name, 2
+        while label in seen:
+            label, n = f"{name} ({n})", n + 1
+        seen.append(label)
+    return seen
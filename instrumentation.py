@@ -0,0 +1,85 @@
+"""Per-stage wall time, CPU time and memory instrumentation for dashboard runs."""
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger("dashboard.perf")
+if not logger.handlers:
+    # One JSON record per line on stderr unless the host configures this logger
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+
+# Reruns kept in each session's diagnostics history
+HISTORY_RUNS = 50
+
+
+# Stages currently measuring memory; tracemalloc runs only while this is > 0
+_tracing_lock = threading.Lock()
+_tracing_stages = 0
+_started_tracing = False
+
+
+def _start_tracing():
+    global _tracing_stages, _started_tracing
+    with _tracing_lock:
+        if _tracing_stages == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_stages += 1
+
+
+def _stop_tracing():
+    global _tracing_stages, _started_tracing
+    with _tracing_lock:
+        _tracing_stages -= 1
+        # Tracing slows every allocation, so it stops with the last traced stage
+        if _tracing_stages == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+class RunProfile:
+    """Stage records for one script run.
+
+    Timing is always collected (it is nearly free). With ``enabled`` each
+    stage also records its peak traced allocation and is logged as one JSON
+    line on the ``dashboard.perf`` logger. CPU time is process-wide, so it
+    includes other sessions' threads running at the same moment.
+
+    Memory figures are approximate: tracemalloc only runs while an enabled
+    stage is open, sees Python/numpy allocations but not Arrow's memory
+    pool, and its peak is process-wide, so stages of concurrent sessions
+    fold into each other's numbers.
+    """
+
+    def __init__(self, run_id, enabled=False):
+        self.run_id = run_id
+        self.enabled = enabled
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        if self.enabled:
+            _start_tracing()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                "run": self.run_id,
+                "stage": name,
+                "wall_ms": round((time.perf_counter() - wall) * 1000, 2),
+                "cpu_ms": round((time.process_time() - cpu) * 1000, 2),
+                "peak_mb": None,
+            }
+            if self.enabled:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                _stop_tracing()
+                record["peak_mb"] = round(max(peak, 0) / 1024 ** 2, 2)
+                logger.info(json.dumps(record))
+            self.stages.append(record)
@@ -0,0 +1,33 @@
+"""Server-side sorting, filtering and paging for the data preview."""
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = [25, 50, 100, 500]
+
+
+def view_positions(df, sort_col=None, ascending=True, filter_col=None, needle=""):
+    """Row positions of ``df`` after a substring filter and an optional sort."""
+    positions = np.arange(len(df))
+
+    if filter_col and needle:
+        s = df[filter_col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # Match against the few categories, then select rows by code
+            hits = s.cat.categories.astype(str).str.contains(needle, case=False, regex=False)
+            mask = s.cat.codes.isin(np.flatnonzero(hits)).to_numpy()
+        else:
+            mask = s.astype("string").str.contains(needle, case=False, regex=False)
+            mask = mask.fillna(False).to_numpy(dtype=bool)
+        positions = positions[mask]
+
+    if sort_col:
+        keys = df[sort_col].iloc[positions].reset_index(drop=True)
+        order = keys.sort_values(ascending=ascending, kind="stable", na_position="last").index
+        positions = positions[order.to_numpy()]
+    return positions
+
+
+def page_slice(df, positions, page, page_size):
+    """Rows for 1-based ``page`` of the view; only these are sent to the browser."""
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]]
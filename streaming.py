@@ -0,0 +1,57 @@
+"""Chunked ingestion: build dashboard aggregates without holding the whole file."""
+import pandas as pd
+
+from transforms import coerce_types
+
+STREAM_CHUNK_ROWS = 250_000
+
+
+class StreamingAggregates:
+    """Running KPI totals, category totals and daily totals over coerced chunks."""
+
+    def __init__(self, amount_col, date_col=None, category_col=None, preview_rows=1000):
+        self.amount_col = amount_col
+        self.date_col = date_col
+        self.category_col = category_col
+        self.preview_rows = preview_rows
+
+        self.total = 0.0
+        self.count = 0
+        self.category_totals = pd.Series(dtype="float64")
+        self.daily_totals = pd.Series(dtype="float64")
+        self.preview = None
+
+    def update(self, chunk):
+        amounts = chunk[self.amount_col]
+        self.total += float(amounts.sum())
+        self.count += len(chunk)
+
+        if self.category_col:
+            part = amounts.groupby(chunk[self.category_col]).sum()
+            self.category_totals = self.category_totals.add(part, fill_value=0)
+
+        if self.date_col:
+            dated = chunk.dropna(subset=[self.date_col])
+            part = dated[self.amount_col].groupby(dated[self.date_col].dt.normalize()).sum()
+            self.daily_totals = self.daily_totals.add(part, fill_value=0)
+
+        if self.preview is None:
+            self.preview = chunk.head(self.preview_rows)
+        elif len(self.preview) < self.preview_rows:
+            missing = self.preview_rows - len(self.preview)
+            self.preview = pd.concat([self.preview, chunk.head(missing)])
+
+    def daily_frame(self):
+        """Per-day totals as a two-column frame sorted by date (date, amount)."""
+        return self.daily_totals.sort_index().rename_axis(self.date_col).rename(self.amount_col).reset_index()
+
+
+def aggregate_csv_stream(file, amount_col, date_col=None, category_col=None,
+                         chunksize=STREAM_CHUNK_ROWS, **read_options):
+    """Read a CSV in chunks, coercing each one and folding it into the aggregates."""
+    aggregates = StreamingAggregates(amount_col, date_col, category_col)
+    for chunk in pd.read_csv(file, chunksize=chunksize, **read_options):
+        aggregates.update(coerce_types(chunk, amount_col, date_col))
+    if aggregates.preview is None:
+        aggregates.preview = pd.DataFrame()
+    return aggregates
@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+
+from exports import write_xlsx
+
+
+def test_write_xlsx_keeps_every_cell(tmp_path):
+    pytest.importorskip("openpyxl")
+    df = pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=250, freq="D"),
+        "Category": pd.Categorical(["Food", "Rent", None, "Travel", "Food"] * 50),
+        "Amount": [float(i) for i in range(250)],
+    })
+    path = tmp_path / "processed.xlsx"
+    write_xlsx(df, str(path), chunk_rows=100)
+
+    back = pd.read_excel(path)
+    assert list(back.columns) == ["Date", "Category", "Amount"]
+    assert len(back) == len(df)
+    assert back["Amount"].tolist() == df["Amount"].tolist()
+    assert back["Category"].isna().sum() == df["Category"].isna().sum()
+    assert (pd.to_datetime(back["Date"]) == df["Date"]).all()
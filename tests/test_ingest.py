@@ -0,0 +1,36 @@
+import io
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from ingest import SOURCE_COLUMN, read_columns, read_many, read_upload
+
+
+def _csv(text):
+    return io.BytesIO(text.encode())
+
+
+def test_read_many_keeps_rows_of_files_missing_every_column():
+    sources = [
+        ("a.csv", _csv("Date,Amount\n2024-01-01,10\n2024-01-02,20\n"), "csv", None),
+        ("b.csv", _csv("Date,Amount,Category\n2024-02-01,30,Food\n"), "csv", None),
+    ]
+    for engine in ("c", "pyarrow"):
+        combined = read_many(sources, usecols=("Category",), engine=engine)
+        assert len(combined) == 3
+        assert combined["Category"].isna().tolist() == [True, True, False]
+        assert combined[SOURCE_COLUMN].tolist() == ["a.csv", "a.csv", "b.csv"]
+
+
+def test_read_columns_hides_pandas_index_columns():
+    df = pd.DataFrame({"Amount": [1.0, 2.0]}, index=pd.Index([10, 20], name=None))
+    buffer = io.BytesIO()
+    df.to_parquet(buffer)
+    assert read_columns(buffer, "parquet") == ["Amount"]
+
+
+def test_read_columns_and_upload_accept_feather_v1():
+    buffer = io.BytesIO()
+    feather.write_feather(pd.DataFrame({"Date": ["2024-01-01"], "Amount": [5.0]}), buffer, version=1)
+    assert read_columns(buffer, "arrow") == ["Date", "Amount"]
+    assert read_upload(buffer, "arrow", usecols=("Amount",))["Amount"].tolist() == [5.0]
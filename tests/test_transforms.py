@@ -0,0 +1,62 @@
+import io
+
+import pandas as pd
+import pytest
+
+from ingest import read_csv
+from transforms import coerce_types, infer_date_format, parse_amounts, parse_dates
+
+LEDGER = b"""Date,Category,Amount
+2024-01-01,Food,"1,200.00"
+2024-01-02,Rent,n/a
+2024-01-03,Food,50.25
+2024-01-04,Travel,
+2024-01-05,Food,65.25
+"""
+
+
+def test_pyarrow_engine_drops_unparseable_amounts():
+    df = read_csv(io.BytesIO(LEDGER), engine="pyarrow")
+    coerced = coerce_types(df, "Amount")
+    assert len(coerced) == 3
+    assert coerced["Amount"].sum() == 1315.50
+
+
+def test_parse_amounts_returns_float64_for_arrow_strings():
+    amounts = parse_amounts(pd.Series(["12.5", "n/a", None], dtype="string[pyarrow]"))
+    assert amounts.dtype == "float64"
+    assert amounts.isna().tolist() == [False, True, True]
+
+
+def test_parse_dates_converts_arrow_dates_to_numpy_datetimes():
+    df = read_csv(io.BytesIO(LEDGER), engine="pyarrow")
+    dates = coerce_types(df, "Amount", "Date")["Date"]
+    assert dates.dtype == "datetime64[ns]"
+    assert dates.iloc[0] == pd.Timestamp("2024-01-01")
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("₹1,234.50", 1234.50),
+    ("Rs. 1,234.50", 1234.50),
+    ("USD 20", 20.0),
+    ("$1,200", 1200.0),
+    ("(250.00)", -250.0),
+    ("250-", -250.0),
+    ("-75.5", -75.5),
+    ("1.234,50", 1234.50),
+    ("12,5", 12.5),
+    ("₹-5", -5.0),
+    ("$-1,200.00", -1200.0),
+    ("USD -20", -20.0),
+])
+def test_parse_amounts_cleans_formatted_values(raw, expected):
+    assert parse_amounts(pd.Series([raw], dtype=object)).iloc[0] == pytest.approx(expected)
+
+
+def test_parse_dates_does_not_reuse_a_day_first_format_for_ambiguous_dates():
+    day_first = pd.Series(["25/01/2024", "01/02/2024"], name="Posted", dtype=object)
+    assert parse_dates(day_first).tolist() == [pd.Timestamp("2024-01-25"), pd.Timestamp("2024-02-01")]
+
+    ambiguous = pd.Series(["01/02/2024", "03/04/2024"], name="Posted", dtype=object)
+    fresh = pd.to_datetime(ambiguous, format=infer_date_format(ambiguous))
+    assert parse_dates(ambiguous).tolist() == fresh.tolist()
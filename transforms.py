@@ -0,0 +1,195 @@
+"""Column coercion shared by the in-memory and streaming pipelines."""
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+DATE_SAMPLE_SIZE = 200
+# Share of distinct values a format must parse to be trusted
+DATE_FORMAT_MIN_MATCH = 0.9
+
+# (date column name, value layout) -> strftime format inferred on an earlier
+# load (process-wide). Formats that also parse with day and month swapped are
+# never stored or reused, so one upload can't decide another's day order.
+_DATE_FORMATS = {}
+
+# String columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def parse_amounts(series, decimal="auto"):
+    """Vectorised amount parsing for messy ledger exports.
+
+    Handles currency symbols/codes ("₹1,234.50", "USD 20", "Rs. 99"), thousands
+    separators, accounting negatives ("(250.00)", "250-") and the locale
+    decimal comma ("1.234,50"). ``decimal`` is ``"."``, ``","`` or ``"auto"``
+    (a comma followed by one or two trailing digits is taken as decimal).
+    Values that still don't parse become NaN. The result is always float64:
+    Arrow-backed doubles keep NaN distinct from null, so ``isna`` / ``dropna``
+    would miss the values that failed to parse.
+    """
+    numbers = _float64(pd.to_numeric(series, errors="coerce"))
+    if pd.api.types.is_numeric_dtype(series):
+        return numbers
+
+    # Only the values the plain parser rejected go through the cleaning kernels
+    needs = numbers.isna() & series.notna()
+    if not needs.any():
+        return numbers
+
+    raw = series[needs].astype("string[pyarrow]").str.strip()
+    # Currency words/symbols go first, with a trailing abbreviation dot ("Rs.")
+    # that would otherwise be read as a decimal point
+    symbols = raw.str.replace(r"[^0-9\s.,()\-]+\.?", "", regex=True).str.strip()
+    # The sign is read after stripping, so "₹-5" and "USD -20" stay negative
+    negative = (
+        symbols.str.fullmatch(r"\(.*\)") | symbols.str.startswith("-") | symbols.str.endswith("-")
+    ).fillna(False)
+    digits = symbols.str.replace(r"[^0-9.,]", "", regex=True)
+
+    if decimal == ",":
+        comma_decimal = pd.Series(True, index=digits.index)
+    elif decimal == ".":
+        comma_decimal = pd.Series(False, index=digits.index)
+    else:
+        comma_decimal = digits.str.fullmatch(r"[0-9.]*,[0-9]{1,2}").fillna(False)
+
+    dot_style = digits.str.replace(",", "", regex=False)
+    comma_style = digits.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    cleaned = pd.to_numeric(dot_style.where(~comma_decimal, comma_style), errors="coerce")
+    cleaned = cleaned.where(~negative, -cleaned)
+
+    numbers = numbers.copy()
+    numbers[needs] = _float64(cleaned)
+    return numbers
+
+
+def _float64(values):
+    # Folds Arrow nulls and NaN into plain numpy NaN
+    return pd.Series(values.to_numpy(dtype="float64", na_value=np.nan), index=values.index, name=values.name)
+
+
+def infer_date_format(values):
+    """Guess one strftime format that parses a sample of ``values``, or None."""
+    sample = pd.Series(values[:DATE_SAMPLE_SIZE]).dropna()
+    for value in sample:
+        fmt = guess_datetime_format(str(value))
+        if fmt:
+            matched = pd.to_datetime(sample, format=fmt, errors="coerce").notna().mean()
+            return fmt if matched >= DATE_FORMAT_MIN_MATCH else None
+    return None
+
+
+def _swap_day_month(fmt):
+    return fmt.replace("%d", "\0").replace("%m", "%d").replace("\0", "%m")
+
+
+def is_ambiguous_format(values, fmt):
+    """True when ``fmt`` with day and month swapped parses a sample of ``values`` as well."""
+    if "%d" not in fmt or "%m" not in fmt:
+        return False
+    sample = pd.Series(values[:DATE_SAMPLE_SIZE]).dropna()
+    return _to_datetime(sample, _swap_day_month(fmt)).notna().mean() >= DATE_FORMAT_MIN_MATCH
+
+
+def _layout(values):
+    # "01/02/2024" and "2024-01-02" -> "99/99/9999" and "9999-99-99"
+    sample = pd.Series(values[:1]).dropna()
+    return re.sub(r"\d", "9", str(sample.iloc[0])) if len(sample) else ""
+
+
+def _to_datetime(values, fmt):
+    if fmt:
+        return pd.to_datetime(values, format=fmt, errors="coerce")
+    return pd.to_datetime(values, errors="coerce")
+
+
+def parse_dates(series):
+    """Coerce a date column, parsing each distinct string only once.
+
+    Ledgers repeat a few thousand date strings over millions of rows, so the
+    uniques are parsed with an inferred explicit format and mapped back via
+    the factorize codes. The format is remembered per column name and value
+    layout, making later loads of the same layout skip inference (unless the
+    values don't settle whether day or month comes first). Arrow date / timestamp
+    columns (pyarrow CSV engine) become numpy datetimes, which resampling
+    and the chart widgets require.
+    """
+    if isinstance(series.dtype, pd.ArrowDtype):
+        arrow_type = series.dtype.pyarrow_dtype
+        if pa.types.is_date(arrow_type):
+            return series.astype("datetime64[ns]")
+        if pa.types.is_timestamp(arrow_type):
+            tz = arrow_type.tz
+            return series.astype(pd.DatetimeTZDtype("ns", tz) if tz else "datetime64[ns]")
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return pd.to_datetime(series, errors="coerce")
+
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(uniques)
+
+    key = (series.name, _layout(uniques))
+    fmt = _DATE_FORMATS.get(key)
+    parsed = None
+    if fmt and not is_ambiguous_format(uniques, fmt):
+        parsed = _to_datetime(uniques, fmt)
+    if parsed is None or parsed.notna().mean() < DATE_FORMAT_MIN_MATCH:
+        fmt = infer_date_format(uniques)
+        parsed = _to_datetime(uniques, fmt)
+        if fmt and not is_ambiguous_format(uniques, fmt):
+            _DATE_FORMATS[key] = fmt
+
+    # Missing values have code -1, which take() maps to the trailing NaT
+    parsed = pd.concat([parsed, pd.Series([pd.NaT], dtype=parsed.dtype)], ignore_index=True)
+    return pd.Series(parsed.take(codes).array, index=series.index, name=series.name)
+
+
+def coerce_types(df, amount_col, date_col=None):
+    """Coerce the amount (dropping rows without one) and optional date column.
+
+    Returns a new frame; ``df`` itself is left untouched.
+    """
+    df = df.assign(**{amount_col: parse_amounts(df[amount_col])})
+    df = df.dropna(subset=[amount_col])  # Remove rows without amount
+
+    if date_col:
+        df = df.assign(**{date_col: parse_dates(df[date_col])})
+    return df
+
+
+def compact_frame(df):
+    """Shrink a loaded frame's dtypes; returns ``(frame, bytes_saved)``.
+
+    Low-cardinality string columns become categoricals and integer (or
+    whole-valued float64) columns are downcast to the narrowest integer
+    type. Arrow-backed numeric columns are left alone. ``bytes_saved`` can be
+    slightly negative for small frames.
+    """
+    changes = {}
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, (pd.CategoricalDtype, pd.ArrowDtype)) and not pd.api.types.is_string_dtype(s):
+            continue
+        if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+            if s.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(s):
+                changes[col] = s.astype("category")
+        elif pd.api.types.is_integer_dtype(s) or s.dtype == "float64":
+            # Floats only become (narrow) integers when every value is whole;
+            # float32 is never used so sums keep full precision
+            downcast = pd.to_numeric(s, downcast="integer")
+            if downcast.dtype != s.dtype:
+                changes[col] = downcast
+
+    if not changes:
+        return df, 0
+    compacted = df.assign(**changes)
+    saved = df.memory_usage(deep=True).sum() - compacted.memory_usage(deep=True).sum()
+    return compacted, int(saved)